@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helper functions compiled with numba to classify timestamps within a set of intervals.
+"""
+
+import numpy as np
+from numba import jit, prange
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def classify(t, starts, ends, out):
+    """
+    Finds in which interval each timestamp falls, with both bounds closed.
+    Each timestamp is located with a binary search over the starts.
+
+    Parameters
+    ----------
+    t : numpy.ndarray
+        The timestamps
+    starts : numpy.ndarray
+        The sorted starts of the intervals
+    ends : numpy.ndarray
+        The sorted ends of the intervals
+    out : numpy.ndarray
+        Integer array of the same length as t, filled with the index
+        of the interval of each timestamp or -1 if it is outside of all intervals.
+    """
+    m = len(starts)
+    for i in prange(len(t)):
+        # Number of starts lower or equal to t[i]
+        lo = 0
+        hi = m
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if starts[mid] <= t[i]:
+                lo = mid + 1
+            else:
+                hi = mid
+        j = lo - 1
+        if j >= 0 and t[i] <= ends[j]:
+            out[i] = j
+        else:
+            out[i] = -1
+
+
+def in_intervals(t, starts, ends):
+    """
+    Returns the index of the interval of each timestamp, -1 if outside of all intervals.
+    See classify.
+    """
+    out = np.empty(len(t), dtype=np.int64)
+    classify(t, starts, ends, out)
+    return out
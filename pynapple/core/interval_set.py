@@ -10,6 +10,7 @@ import warnings
 import pandas as pd
 import numpy as np
 from .time_units import TimeUnits
+from ._intervals import in_intervals
 
 def _join_helper(start, end):
     time = np.hstack((start, end))
@@ -332,17 +333,10 @@ class IntervalSet(pd.DataFrame):
         out: numpy.ndarray
             an array with the interval index labels for each time stamp (NaN) for timestamps not in IntervalSet
         """
-        bins = self.values.ravel()
-        # Because yes there is no funtion with both bounds closed as an option
-        ix = np.array(pd.cut(tsd.index, bins, labels=np.arange(len(bins) - 1, dtype=np.float64)))
-        ix2 = np.array(pd.cut(tsd.index, bins, labels=np.arange(len(bins) - 1, dtype=np.float64), right=False))
-        ix3 = np.vstack((ix, ix2)).T
-        # ix[np.floor(ix / 2) * 2 != ix] = np.NaN
-        # ix = np.floor(ix/2)
-        ix3[np.floor(ix3 / 2) * 2 != ix3] = np.NaN
-        ix3 = np.floor(ix3/2)
-        ix3[np.isnan(ix3[:,0]),0] = ix3[np.isnan(ix3[:,0]),1]
-        return ix3[:,0]
+        t = tsd.index.values.astype(np.float64)
+        ix = in_intervals(t, self['start'].values, self['end'].values).astype(np.float64)
+        ix[ix < 0] = np.NaN
+        return ix
 
     def drop_short_intervals(self, threshold, time_units='s'):
         """
@@ -10,6 +10,7 @@ import warnings
 from .time_units import TimeUnits
 from pandas.core.internals import SingleBlockManager, BlockManager
 from .interval_set import IntervalSet
+from ._intervals import in_intervals
 
 def _get_restrict_method(align):
     """
@@ -25,11 +26,47 @@ def _get_restrict_method(align):
         raise ValueError('Unrecognized restrict align method')
     return method
 
+def _align_sorted(src_index, src_values, new_index, method):
+    """
+    Realign the values of a sorted index onto a new sorted index.
+    Equivalent to pandas reindex with method 'nearest', 'bfill' or 'pad',
+    including NaN where no value can be found.
+    """
+    n = len(src_index)
+    if method == 'pad':
+        pos = np.searchsorted(src_index, new_index, side='right') - 1
+    elif method == 'bfill':
+        pos = np.searchsorted(src_index, new_index, side='left')
+    elif method == 'nearest':
+        left = np.searchsorted(src_index, new_index, side='right') - 1
+        right = np.searchsorted(src_index, new_index, side='left')
+        if n:
+            left_dist = np.abs(new_index - src_index[np.maximum(left, 0)])
+            right_dist = np.abs(src_index[np.minimum(right, n - 1)] - new_index)
+            # Ties go to the next value as in pandas
+            use_left = (left >= 0) & ((right >= n) | (left_dist < right_dist))
+            pos = np.where(use_left, left, right)
+        else:
+            pos = right
+    else:
+        raise ValueError('Unrecognized restrict align method')
+
+    if n:
+        new_values = src_values[np.clip(pos, 0, n - 1)]
+    else:
+        new_values = np.empty((len(new_index),) + src_values.shape[1:], dtype=src_values.dtype)
+    missing = (pos < 0) | (pos >= n)
+    if missing.any():
+        new_values = new_values.astype(np.result_type(new_values.dtype, np.float64))
+        new_values[missing] = np.NaN
+    return new_values
+
 def gaps_func(data, min_gap, method='absolute'):
     """
     finds gaps in a tsd
     """    
-    dt = np.diff(data.times(units='us'))
+    t = data.times(units='us')
+    dt = np.diff(t)
 
     if method == 'absolute':
         pass
@@ -39,12 +76,10 @@ def gaps_func(data, min_gap, method='absolute'):
     else:
         raise ValueError('unrecognized method')
 
-    ix = np.where(dt > min_gap)
-    t = data.times()
+    ix = np.flatnonzero(dt > min_gap)
     st = t[ix] + 1
-    en = t[(np.array(ix) + 1)] - 1
-    from neuroseries.interval_set import IntervalSet
-    return IntervalSet(st, en)
+    en = t[ix + 1] - 1
+    return IntervalSet(st, en, time_units='us')
 
 def support_func(data, min_gap, method='absolute'):
     """
@@ -53,8 +88,7 @@ def support_func(data, min_gap, method='absolute'):
 
     here_gaps = data.gaps(min_gap, method=method)
     t = data.times('us')
-    from neuroseries.interval_set import IntervalSet
-    span = IntervalSet(t[0] - 1, t[-1] + 1)
+    span = IntervalSet(t[0] - 1, t[-1] + 1, time_units='us')
     support_here = span.set_diff(here_gaps)
     return support_here
 
@@ -102,16 +136,7 @@ class Tsd(pd.Series):
 
         if len(t):
             if time_support is not None:
-                bins = time_support.values.ravel()
-                # Because yes there is no funtion with both bounds closed as an option
-                ix = np.vstack((
-                    np.array(pd.cut(t, bins, labels=np.arange(len(bins) - 1, dtype=np.float64))),
-                    np.array(pd.cut(t, bins, labels=np.arange(len(bins) - 1, dtype=np.float64), right=False))
-                    )).T
-                ix[np.floor(ix / 2) * 2 != ix] = np.NaN
-                ix = np.floor(ix/2)
-                ix[np.isnan(ix[:,0]),0] = ix[np.isnan(ix[:,0]),1]
-                ix = ~np.isnan(ix[:,0])
+                ix = in_intervals(t, time_support.start.values, time_support.end.values) >= 0
                 if d is not None:
                     super().__init__(index=t[ix], data=d[ix])
                 else:
@@ -127,11 +152,21 @@ class Tsd(pd.Series):
             super().__init__(index=t, data=d, dtype=np.float64)
 
         self.time_support = time_support
-        self.rate = len(t)/self.time_support.tot_length('s')
+        self._rate = None
         self.index.name = "Time (s)"
         self._metadata.append("nap_class")
         self.nap_class = self.__class__.__name__
 
+    @property
+    def rate(self):
+        """
+        Frequency of the time series (Hz) computed over the time support.
+        It is computed the first time it is accessed.
+        """
+        if self._rate is None:
+            self._rate = len(self.index)/self.time_support.tot_length('s')
+        return self._rate
+
     def __lt__(self, value):
         return self.as_series().__lt__(value)
 
@@ -172,16 +207,21 @@ class Tsd(pd.Series):
         times = TimeUnits.return_timestamps(self.index.values.astype(np.float64), units)
         return times
 
-    def as_series(self):
+    def as_series(self, copy=False):
         """
         Convert the Ts/Tsd object to a pandas.Series object.
         
+        Parameters
+        ----------
+        copy : bool, optional
+            Wheter or not to copy the data (default is False, the series shares the data of the Tsd)
+        
         Returns
         -------
         out: pandas.Series
             _
         """
-        return pd.Series(self, copy=True)
+        return pd.Series(self.values, index=self.index, name=self.name, copy=copy)
 
     def as_units(self, units='s'):
         """
@@ -197,12 +237,11 @@ class Tsd(pd.Series):
         pandas.Series
             the series object with adjusted times
         """
-        ss = self.as_series()
         t = self.index.values
         t = TimeUnits.return_timestamps(t, units)
         if units == 'us':
             t = t.astype(np.int64)
-        ss.index = t
+        ss = pd.Series(self.values, index=t, name=self.name, copy=False)
         units_str = units
         if not units_str:
             units_str = 's'
@@ -265,9 +304,8 @@ class Tsd(pd.Series):
         method = _get_restrict_method(align)
         ix = TimeUnits.format_timestamps(self.restrict(ep).index.values)
         tsd = tsd.restrict(ep)
-        tsd = tsd.as_series()
-        new_tsd = tsd.reindex(ix, method=method)
-        return Tsd(new_tsd, time_support = ep)
+        new_values = _align_sorted(tsd.index.values, tsd.values, ix, method)
+        return Tsd(t=ix, d=new_values, time_support = ep)
 
     def restrict(self, ep):
         """
@@ -301,13 +339,9 @@ class Tsd(pd.Series):
         >>> 0    0.0  500.0
         
         """
-        ix = ep.in_interval(self)
-        tsd_r = pd.DataFrame(self, copy=True)
-        col = tsd_r.columns[0]
-        tsd_r['interval'] = ix
-        ix = ~np.isnan(ix)
-        tsd_r = tsd_r[ix]
-        return Tsd(tsd_r[col], time_support=ep)
+        t = self.index.values
+        ix = in_intervals(t, ep.start.values, ep.end.values) >= 0
+        return Tsd(t=t[ix], d=self.values[ix], time_support=ep)
 
     def count(self, bin_size, ep = None, time_units = 's'):
         """
@@ -358,14 +392,28 @@ class Tsd(pd.Series):
         bin_size = TimeUnits.format_timestamps(np.array([bin_size]), time_units)[0]
 
         # bin for each epochs
-        time_index = []
-        count = []
-        for i in ep.index:
-            bins = np.arange(ep.start[i], ep.end[i] + bin_size, bin_size)
-            count.append(np.histogram(self.index.values, bins)[0])
-            time_index.append(bins[0:-1] + np.diff(bins)/2)
-        time_index = np.hstack(time_index)
-        count = np.hstack(count)
+        # Edges of all epochs are built at once, with the same values as np.arange.
+        # As in np.histogram, counts are differences of searchsorted on the edges,
+        # with the last edge of each epoch closed on the right.
+        # Bins of consecutive epochs can overlap and are counted independently.
+        starts = ep.start.values
+        ends = ep.end.values
+        nedges = np.ceil((ends + bin_size - starts) / bin_size).astype(np.intp)
+        offsets = np.hstack((0, np.cumsum(nedges)))
+        k = np.arange(offsets[-1]) - np.repeat(offsets[:-1], nedges)
+        delta = (starts + bin_size) - starts
+        edges = np.repeat(starts, nedges) + k * np.repeat(delta, nedges)
+
+        t = self.index.values
+        last = offsets[1:] - 1
+        ix = np.searchsorted(t, edges, side='left')
+        ix[last] = np.searchsorted(t, edges[last], side='right')
+
+        # Dropping the differences between the last edge of an epoch and the first edge of the next
+        keep = np.ones(len(edges) - 1, dtype=np.bool_)
+        keep[last[:-1]] = False
+        count = np.diff(ix)[keep]
+        time_index = (edges[0:-1] + np.diff(edges)/2)[keep]
         return Tsd(t=time_index, d=count, time_support=ep)
 
     def threshold(self, thr, method='above'):
@@ -528,16 +576,7 @@ class TsdFrame(pd.DataFrame):
         t = TimeUnits.format_timestamps(t, time_units)
 
         if time_support is not None:
-            bins = time_support.values.ravel()
-            # Because yes there is no funtion with both bounds closed as an option
-            ix = np.vstack((
-                np.array(pd.cut(t, bins, labels=np.arange(len(bins) - 1, dtype=np.float64))),
-                np.array(pd.cut(t, bins, labels=np.arange(len(bins) - 1, dtype=np.float64), right=False))
-                )).T
-            ix[np.floor(ix / 2) * 2 != ix] = np.NaN
-            ix = np.floor(ix/2)
-            ix[np.isnan(ix[:,0]),0] = ix[np.isnan(ix[:,0]),1]
-            ix = ~np.isnan(ix[:,0])
+            ix = in_intervals(t, time_support.start.values, time_support.end.values) >= 0
             super().__init__(index=t[ix],data=d[ix], columns = c)
         else:
             time_support = IntervalSet(start = t[0], end = t[-1])
@@ -547,11 +586,21 @@ class TsdFrame(pd.DataFrame):
             warnings.simplefilter("ignore")
             self.time_support = time_support
 
-        self.rate = len(t)/self.time_support.tot_length('s')
+        self._rate = None
         self.index.name = "Time (s)"
         self._metadata.append("nap_class")
         self.nap_class = self.__class__.__name__
 
+    @property
+    def rate(self):
+        """
+        Frequency of the time series (Hz) computed over the time support.
+        It is computed the first time it is accessed.
+        """
+        if self._rate is None:
+            self._rate = len(self.index)/self.time_support.tot_length('s')
+        return self._rate
+
     def __repr__(self):
         return self.as_units('s').__repr__()
 
@@ -606,17 +655,16 @@ class TsdFrame(pd.DataFrame):
         out: pandas.DataFrame
             the series object with adjusted times
         """
-        t = self.index.values.copy()
+        t = self.index.values
         t = TimeUnits.return_timestamps(t, units)
         if units == 'us':
             t = t.astype(np.int64)
 
-        df = pd.DataFrame(index=t, data=self.values)
+        df = pd.DataFrame(self.values, index=t, columns=self.columns, copy=False)
         units_str = units
         if not units_str:
             units_str = 's'
         df.index.name = "Time (" + units_str + ")"
-        df.columns = self.columns.copy()
         return df
 
     def data(self):
@@ -636,7 +684,11 @@ class TsdFrame(pd.DataFrame):
         method = _get_restrict_method(align)
         ix = TimeUnits.format_timestamps(t)
 
-        rest_t = self.reindex(ix, method=method, columns=self.columns.values)
+        rest_t = pd.DataFrame(
+            _align_sorted(self.index.values, self.values, ix, method),
+            index=pd.Index(ix, name=self.index.name),
+            columns=self.columns
+            )
         return rest_t
 
     def value_from(self, tsd, ep=None, align='closest'):
@@ -684,9 +736,8 @@ class TsdFrame(pd.DataFrame):
         method = _get_restrict_method(align)
         ix = TimeUnits.format_timestamps(self.restrict(ep).index.values)
         tsd = tsd.restrict(ep)
-        tsd = tsd.as_series()
-        new_tsd = tsd.reindex(ix, method=method)
-        return Tsd(new_tsd, time_support = ep)
+        new_values = _align_sorted(tsd.index.values, tsd.values, ix, method)
+        return Tsd(t=ix, d=new_values, time_support = ep)
 
     def restrict(self, iset, keep_labels=False):
         """
@@ -705,14 +756,16 @@ class TsdFrame(pd.DataFrame):
             TsdFrame object restricted to ep
         
         """
-        ix = iset.in_interval(self)
-        tsd_r = pd.DataFrame(self, copy=True)
-        tsd_r['interval'] = ix
-        ix = ~np.isnan(ix)
-        tsd_r = tsd_r[ix]
-        if not keep_labels:
-            del tsd_r['interval']
-        return TsdFrame(tsd_r, time_support=iset, copy=True)
+        t = self.index.values
+        interval = in_intervals(t, iset.start.values, iset.end.values)
+        ix = interval >= 0
+        t = t[ix]
+        d = self.values[ix]
+        c = self.columns.values
+        if keep_labels:
+            d = np.hstack((d, interval[ix,np.newaxis].astype(np.float64)))
+            c = np.hstack((c, np.array(['interval'], dtype=object)))
+        return TsdFrame(t=t, d=d, columns=c, time_support=iset)
 
     def gaps(self, min_gap, method='absolute'):
         return gaps_func(self, min_gap, method)
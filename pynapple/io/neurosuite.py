@@ -339,16 +339,11 @@ class NeuroSuite(BaseLoader):
 
         n_channels = int(self.nChannels)
 
-        f = open(filepath, 'rb')
-        startoffile = f.seek(0, 0)
-        endoffile = f.seek(0, 2)
-        bytes_size = 2      
-        n_samples = int((endoffile-startoffile)/n_channels/bytes_size)
+        bytes_size = 2
+        n_samples = int(os.path.getsize(filepath)/n_channels/bytes_size)
         duration = n_samples/frequency
-        interval = 1/frequency
-        f.close()
-        fp = np.memmap(filepath, np.int16, 'r', shape = (n_samples, n_channels))        
-        timestep = np.arange(0, n_samples)/frequency
+        fp = np.memmap(filepath, np.int16, 'r', shape = (n_samples, n_channels))
+        timestep = np.arange(n_samples, dtype=np.float64) * (1.0/frequency)
 
         time_support = nap.IntervalSet(start = 0, end = duration, time_units = 's')
 
@@ -364,10 +359,19 @@ class NeuroSuite(BaseLoader):
                 d=fp[:,channel], 
                 time_units = 's',
                 time_support = time_support)
-        elif type(channel) is list:            
+        elif type(channel) is list:
+            # Reading the file sequentially by blocks of samples
+            # and gathering the channels within each block
+            lfp = np.empty((n_samples, len(channel)), dtype=np.int16)
+            chunk = max(1, 2**20//n_channels)
+            with open(filepath, 'rb') as f:
+                for i in range(0, n_samples, chunk):
+                    n = min(chunk, n_samples - i)
+                    block = np.fromfile(f, np.int16, n*n_channels).reshape(n, n_channels)
+                    lfp[i:i+n] = block[:,channel]
             return nap.TsdFrame(
                 t = timestep,
-                d=fp[:,channel], 
+                d=lfp, 
                 time_units = 's',
                 time_support = time_support,
                 columns=channel)
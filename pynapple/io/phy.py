@@ -88,10 +88,15 @@ class Phy(BaseLoader):
         if os.path.isfile(os.path.join(path, 'channel_map.npy')):
             channel_map = np.load(os.path.join(path, 'channel_map.npy'))
             self.channel_map = {i:channel_map[i] for i in range(len(channel_map))}
+            n_channels_per_shank = np.array([len(channel_map[i]) for i in range(len(channel_map))])
+            shanks = np.repeat(np.arange(len(channel_map)), n_channels_per_shank)
             self.ch_to_sh = pd.Series(
-                index=channel_map.flatten(), 
-                data=np.hstack([np.ones(len(channel_map[i]),dtype=int)*i for i in range(len(channel_map))])
+                index=channel_map.flatten(),
+                data=shanks
                 )
+            # Same mapping as a plain array indexed by channel
+            self._ch_to_sh_arr = np.full(channel_map.max()+1, -1, dtype=np.int64)
+            self._ch_to_sh_arr[channel_map.flatten()] = shanks
         else:
             raise RuntimeError("Can't find channel_map.npy in path {};".format(path))
            
@@ -135,12 +140,20 @@ class Phy(BaseLoader):
         else:
             raise RuntimeError("Can't find cluster_info.tsv or cluster_group.tsv in {};".format(path))
 
-        spike_times = np.load(os.path.join(path, 'spike_times.npy'))
-        spike_clusters = np.load(os.path.join(path, 'spike_clusters.npy'))
+        spike_times = np.load(os.path.join(path, 'spike_times.npy')).ravel()
+        spike_clusters = np.load(os.path.join(path, 'spike_clusters.npy')).ravel()
+
+        # Sorting once by cluster so that each cluster is a contiguous slice
+        # Spike times are converted to seconds in the same pass
+        order = np.argsort(spike_clusters, kind='stable')
+        spike_clusters = spike_clusters[order]
+        spike_times = spike_times[order]/self.sample_rate
+        starts = np.searchsorted(spike_clusters, cluster_id_good, side='left')
+        ends = np.searchsorted(spike_clusters, cluster_id_good, side='right')
 
         spikes = {}
-        for n in cluster_id_good:
-            spikes[n] = nap.Ts(t=spike_times[spike_clusters==n]/self.sample_rate, time_support=time_support)
+        for n, s, e in zip(cluster_id_good, starts, ends):
+            spikes[n] = nap.Ts(t=spike_times[s:e], time_units='s', time_support=time_support)
 
         self.spikes = nap.TsGroup(spikes, time_support=time_support)
 
@@ -154,21 +167,24 @@ class Phy(BaseLoader):
         else:
             template = np.load(os.path.join(path, 'templates.npy'))
             template = template[cluster_id_good]
-            ch = np.power(template, 2).max(1).argmax(1)            
-            group = pd.Series(index=cluster_id_good,data=self.ch_to_sh[ch].values)
+            # Channel of maximum absolute amplitude without squaring the whole template array
+            ch = np.maximum(template.max(1), -template.min(1)).argmax(1)
+            unmapped = ch >= len(self._ch_to_sh_arr)
+            unmapped[~unmapped] = self._ch_to_sh_arr[ch[~unmapped]] < 0
+            if unmapped.any():
+                raise RuntimeError("Channels {} are not in channel_map.npy;".format(np.unique(ch[unmapped])))
+            group = pd.Series(index=cluster_id_good,data=self._ch_to_sh_arr[ch])
             self.spikes.set_info(group=group)
 
-        names = pd.Series(
-            index = group.index,
-            data = [self.ephys_information[group.loc[i]]['name'] for i in group.index]
-            )
+        missing = ~group.isin(list(self.ephys_information.keys()))
+        if missing.any():
+            raise RuntimeError("Groups {} have no ephys information;".format(np.unique(group[missing].values)))
+
+        names = group.map({g:info['name'] for g, info in self.ephys_information.items()})
         if ~np.all(names.values==''):
             self.spikes.set_info(name=names)
 
-        locations = pd.Series(
-            index = group.index,
-            data = [self.ephys_information[group.loc[i]]['location'] for i in group.index]
-            )
+        locations = group.map({g:info['location'] for g, info in self.ephys_information.items()})
         if ~np.all(locations.values==''):
             self.spikes.set_info(location=locations)
 
@@ -230,13 +246,16 @@ class Phy(BaseLoader):
         # Adding units
         nwbfile.add_unit_column('location', 'the anatomical location of this unit')
         nwbfile.add_unit_column('group', 'the group of the unit')
-        for u in self.spikes.keys():
+        keys = list(self.spikes.keys())
+        groups = self.spikes.get_info('group').loc[keys].values
+        locations = {g:self.ephys_information[g]['location'] for g in self.ephys_information}
+        for i, u in enumerate(keys):
             nwbfile.add_unit(
                 id=u,
-                spike_times=self.spikes[u].as_units('s').index.values,                
-                electrode_group=electrode_groups[self.spikes.get_info('group').loc[u]],
-                location=self.ephys_information[self.spikes.get_info('group').loc[u]]['location'],
-                group=self.spikes.get_info('group').loc[u]
+                spike_times=self.spikes[u].index.values,
+                electrode_group=electrode_groups[groups[i]],
+                location=locations[groups[i]],
+                group=groups[i]
                 )
 
         io.write(nwbfile)
@@ -333,16 +352,11 @@ class Phy(BaseLoader):
 
         n_channels = int(self.nChannels)
 
-        f = open(filepath, 'rb')
-        startoffile = f.seek(0, 0)
-        endoffile = f.seek(0, 2)
-        bytes_size = 2      
-        n_samples = int((endoffile-startoffile)/n_channels/bytes_size)
+        bytes_size = 2
+        n_samples = int(os.path.getsize(filepath)/n_channels/bytes_size)
         duration = n_samples/frequency
-        interval = 1/frequency
-        f.close()
-        fp = np.memmap(filepath, np.int16, 'r', shape = (n_samples, n_channels))        
-        timestep = np.arange(0, n_samples)/frequency
+        fp = np.memmap(filepath, np.int16, 'r', shape = (n_samples, n_channels))
+        timestep = np.arange(n_samples, dtype=np.float64) * (1.0/frequency)
 
         time_support = nap.IntervalSet(start = 0, end = duration, time_units = 's')
 
@@ -358,10 +372,19 @@ class Phy(BaseLoader):
                 d=fp[:,channel], 
                 time_units = 's',
                 time_support = time_support)
-        elif type(channel) is list:            
+        elif type(channel) is list:
+            # Reading the file sequentially by blocks of samples
+            # and gathering the channels within each block
+            lfp = np.empty((n_samples, len(channel)), dtype=np.int16)
+            chunk = max(1, 2**20//n_channels)
+            with open(filepath, 'rb') as f:
+                for i in range(0, n_samples, chunk):
+                    n = min(chunk, n_samples - i)
+                    block = np.fromfile(f, np.int16, n*n_channels).reshape(n, n_channels)
+                    lfp[i:i+n] = block[:,channel]
             return nap.TsdFrame(
                 t = timestep,
-                d=fp[:,channel], 
+                d=lfp, 
                 time_units = 's',
                 time_support = time_support,
                 columns=channel)
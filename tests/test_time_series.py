@@ -111,6 +111,39 @@ def test_create_tsdframe_with_time_support():
     np.testing.assert_array_almost_equal(tsdframe.time_support.start, ep.start)
     np.testing.assert_array_almost_equal(tsdframe.time_support.end, ep.end)
 
+def test_rate_with_time_support():
+    ep = nap.IntervalSet(start=[0,20], end=[10,30])
+    tsd = nap.Tsd(t=np.arange(100), d=np.random.rand(100), time_units='s', time_support=ep)
+    np.testing.assert_approx_equal(tsd.rate, 22/20)
+    tsdframe = nap.TsdFrame(t=np.arange(100), d=np.random.rand(100,3), time_units='s', time_support=ep)
+    np.testing.assert_approx_equal(tsdframe.rate, 22/20)
+
+def test_count_with_gap_shorter_than_bin_size():
+    ts = nap.Ts(t=np.arange(0, 100, 0.37), time_units='s')
+    ep = nap.IntervalSet(start=[0, 19.5], end=[19.2, 42])
+    count = ts.count(5, ep)
+    bins1 = np.arange(0, 24.2, 5)
+    bins2 = np.arange(19.5, 47, 5)
+    # The last bin of the first epoch overlaps the second epoch
+    np.testing.assert_array_equal(
+        count.values,
+        np.hstack((
+            np.histogram(ts.index.values, bins1)[0],
+            np.histogram(ts.index.values, bins2)[0]
+            ))
+        )
+    np.testing.assert_array_almost_equal(
+        count.index.values,
+        np.hstack((bins1[0:-1] + 2.5, bins2[0:-1] + 2.5))
+        )
+
+def test_gaps():
+    ts = nap.Ts(t=np.array([0, 1, 2, 10, 11, 20]), time_units='s')
+    gaps = ts.gaps(1.5e6)
+    assert isinstance(gaps, nap.IntervalSet)
+    np.testing.assert_array_almost_equal(gaps.start.values, [2.000001, 11.000001])
+    np.testing.assert_array_almost_equal(gaps.end.values, [9.999999, 19.999999])
+
 ####################################################
 # General test for time series
 ####################################################
@@ -186,6 +219,10 @@ class Test_Time_Series_2:
     def test_as_series(self, tsd):
         assert isinstance(tsd.as_series(), pd.Series)
 
+    def test_as_series_copy(self, tsd):
+        assert np.shares_memory(tsd.as_series().values, tsd.values)
+        assert not np.shares_memory(tsd.as_series(copy=True).values, tsd.values)
+
     def test_count(self, tsd):
         count = tsd.count(1)
         assert len(count)==99
@@ -203,6 +240,23 @@ class Test_Time_Series_2:
             np.ones(100)
             )
 
+    def test_count_with_multiple_epochs(self, tsd):
+        ep = nap.IntervalSet(start=[0, 20.5], end=[10, 50])
+        count = tsd.count(2, ep)
+        bins1 = np.arange(0, 12, 2)
+        bins2 = np.arange(20.5, 52, 2)
+        np.testing.assert_array_equal(
+            count.values,
+            np.hstack((
+                np.histogram(tsd.index.values, bins1)[0],
+                np.histogram(tsd.index.values, bins2)[0]
+                ))
+            )
+        np.testing.assert_array_almost_equal(
+            count.index.values,
+            np.hstack((bins1[0:-1] + 1, bins2[0:-1] + 1))
+            )
+
     def test_threshold(self, tsd):
         thrs = tsd.threshold(0.5, 'above')
         assert len(thrs) == np.sum(tsd.values>0.5)
@@ -257,4 +311,30 @@ class Test_Time_Series_3:
         assert isinstance(tsdframe.as_dataframe(), pd.DataFrame)
 
     def test_slicing(self, tsdframe):
-        assert isinstance(tsdframe[0], nap.Tsd)
\ No newline at end of file
+        assert isinstance(tsdframe[0], nap.Tsd)
+
+    def test_restrict_keep_labels(self, tsdframe):
+        ep = nap.IntervalSet(start=[0,20], end=[10,30])
+        tsdframe2 = tsdframe.restrict(ep, keep_labels=True)
+        assert isinstance(tsdframe2, nap.TsdFrame)
+        assert len(tsdframe2) == 22
+        assert list(tsdframe2.columns) == [0, 1, 2, 'interval']
+        np.testing.assert_array_almost_equal(
+            tsdframe2['interval'].values,
+            np.hstack((np.zeros(11), np.ones(11)))
+            )
+
+    def test_realign(self, tsdframe):
+        t = np.array([0.4, 0.5, 10.6, 98.2])
+        np.testing.assert_array_almost_equal(
+            tsdframe.realign(t, align='closest').values,
+            tsdframe.values[[0, 1, 11, 98]]
+            )
+        np.testing.assert_array_almost_equal(
+            tsdframe.realign(t, align='prev').values,
+            tsdframe.values[[0, 0, 10, 98]]
+            )
+        np.testing.assert_array_almost_equal(
+            tsdframe.realign(t, align='next').values,
+            tsdframe.values[[1, 1, 11, 99]]
+            )